@@ -0,0 +1,77 @@
+"""Микробенчмарк вычисления следующей даты обслуживания для 10 000 компонентов.
+
+Запуск из корня репозитория: ``python benchmarks/bench_recurrence.py``.
+Модуль правил не зависит от Home Assistant и загружается напрямую по пути.
+"""
+from __future__ import annotations
+
+import importlib.util
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+MODULE_PATH = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "maintainable" / "recurrence.py"
+)
+
+RULES = [
+    "FREQ=MONTHLY;INTERVAL=3;BYDAY=1MO",
+    "FREQ=MONTHLY;INTERVAL=6;BYMONTHDAY=1",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR;EXDATE=20261225,20270101,20270108",
+    "FREQ=DAILY;INTERVAL=90",
+    "FREQ=MONTHLY;BYDAY=-1FR",
+    "FREQ=YEARLY;BYMONTH=3,9;BYDAY=2TU",
+    "FREQ=WEEKLY;INTERVAL=3;BYDAY=MO,TH",
+    "FREQ=MONTHLY;BYMONTHDAY=31",
+]
+
+COMPONENTS = 10_000
+ROUNDS = 5
+
+
+def _load_recurrence():
+    spec = importlib.util.spec_from_file_location("maintainable_recurrence", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _best_of(func) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    recurrence = _load_recurrence()
+    rng = random.Random(42)
+    components = [
+        (rng.choice(RULES), date(2025, 1, 1) + timedelta(days=rng.randrange(730)))
+        for _ in range(COMPONENTS)
+    ]
+
+    def fixed_interval() -> None:
+        for _, last in components:
+            last + timedelta(days=90)
+
+    def calendar_rules() -> None:
+        for text, last in components:
+            recurrence.parse_rule(text).next_after(last)
+
+    baseline = _best_of(fixed_interval)
+    elapsed = _best_of(calendar_rules)
+    print(f"Компонентов: {COMPONENTS}, различных правил: {len(RULES)}")
+    print(f"Фиксированный интервал: {baseline * 1000:.2f} мс")
+    print(f"Календарные правила:    {elapsed * 1000:.2f} мс "
+          f"({elapsed / COMPONENTS * 1e6:.2f} мкс на компонент)")
+    print(f"Кэш разбора правил: {recurrence._parse_normalized.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
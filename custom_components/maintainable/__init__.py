@@ -7,34 +7,109 @@ from datetime import datetime, timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, callback, ServiceCall
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 from homeassistant.helpers.event import async_track_time_interval
 import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_EXPORT,
+    CONF_EXPORT_BACKUP_COUNT,
+    CONF_EXPORT_BATCH_SIZE,
+    CONF_EXPORT_FILE,
+    CONF_EXPORT_FLUSH_INTERVAL,
+    CONF_EXPORT_MAX_BYTES,
+    CONF_EXPORT_MAX_QUEUE,
+    CONF_EXPORT_MQTT_TOPIC,
     DATA_COORDINATOR,
+    DATA_EXPORTER,
+    DATA_INDEX,
     DOMAIN,
+    MAINTENANCE_STATUS_DUE,
+    MAINTENANCE_STATUS_OK,
+    MAINTENANCE_STATUS_OVERDUE,
     PLATFORMS,
 )
 from .coordinator import MaintenanceCoordinator
+from .exporter import MaintenanceExporter, async_create_sink
+from .index import SORT_DAYS, SORT_NAME, MaintenanceIndex
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(minutes=30)  # Проверка каждые 30 минут
 
+EXPORT_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Exclusive(CONF_EXPORT_MQTT_TOPIC, "destination"): cv.string,
+        vol.Exclusive(CONF_EXPORT_FILE, "destination"): cv.string,
+        vol.Optional(CONF_EXPORT_MAX_BYTES, default=10 * 1024 * 1024): cv.positive_int,
+        vol.Optional(CONF_EXPORT_BACKUP_COUNT, default=3): cv.positive_int,
+        vol.Optional(CONF_EXPORT_BATCH_SIZE, default=100): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_EXPORT_FLUSH_INTERVAL, default=5): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_EXPORT_MAX_QUEUE, default=10000): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }),
+    cv.has_at_least_one_key(CONF_EXPORT_MQTT_TOPIC, CONF_EXPORT_FILE),
+)
+
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.Schema({vol.Optional(CONF_EXPORT): EXPORT_SCHEMA})},
+    extra=vol.ALLOW_EXTRA,
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Настройка интеграции."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data.setdefault(DATA_INDEX, MaintenanceIndex())
+    
+    @callback
+    def handle_device_registry_updated(event: Event) -> None:
+        """Переиндексировать компоненты, привязанные к изменённому устройству."""
+        device_id = event.data.get("device_id")
+        for entry_id in hass.data[DATA_INDEX].device_entry_ids(device_id):
+            if entry_data := hass.data[DOMAIN].get(entry_id):
+                entry_data[DATA_COORDINATOR].async_update_index()
+    
+    @callback
+    def handle_entity_registry_updated(event: Event) -> None:
+        """Переиндексировать компонент при регистрации его сущности или изменении её зоны и меток."""
+        # Первое обновление координатора индексирует компонент до регистрации сенсоров
+        if event.data.get("action") not in ("create", "update"):
+            return
+        entity = er.async_get(hass).async_get(event.data["entity_id"])
+        if entity is None or entity.platform != DOMAIN:
+            return
+        entry_data = hass.data[DOMAIN].get(entity.config_entry_id)
+        if entry_data:
+            entry_data[DATA_COORDINATOR].async_update_index()
+    
+    hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, handle_device_registry_updated)
+    hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, handle_entity_registry_updated)
+    
+    # Настраиваем экспорт состояния, если он указан в configuration.yaml
+    if export_config := config.get(DOMAIN, {}).get(CONF_EXPORT):
+        exporter = MaintenanceExporter(hass, async_create_sink(hass, export_config), export_config)
+        await exporter.async_start()
+        hass.data[DATA_EXPORTER] = exporter
+    
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Настройка записи конфигурации."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data.setdefault(DATA_INDEX, MaintenanceIndex())
     
     # Создаем координатор для управления данными
     coordinator = MaintenanceCoordinator(hass, entry)
@@ -47,6 +122,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Настраиваем платформы
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
+    # Запускаем отслеживание условий по сенсорам
+    coordinator.async_start_conditions()
+    entry.async_on_unload(coordinator.async_stop_conditions)
+    entry.async_on_unload(coordinator.async_cancel_stage_wake)
+    
+    # Применяем изменения настроек без перезагрузки записи
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    
     # Настраиваем автоматическое обновление
     async def update_maintenance_status(now):
         """Обновляет статус обслуживания."""
@@ -67,6 +150,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Выгрузка записи конфигурации."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_INDEX].remove(entry.entry_id)
+        if (exporter := hass.data.get(DATA_EXPORTER)) is not None:
+            exporter.remove(entry.entry_id)
     
     return unload_ok
 
@@ -77,6 +163,20 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await async_setup_entry(hass, entry)
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Применение изменённых настроек компонента."""
+    coordinator: MaintenanceCoordinator = hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
+    
+    # Перепривязываем сущности, если изменилось устройство
+    device_id = entry.data.get("device_id")
+    entity_registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        if entity.device_id != device_id:
+            entity_registry.async_update_entity(entity.entity_id, device_id=device_id)
+    
+    await coordinator.async_apply_entry_update()
+
+
 async def _async_register_services(hass: HomeAssistant) -> None:
     """Регистрация сервисов интеграции."""
     
@@ -117,6 +217,38 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         else:
             _LOGGER.error("Не найден координатор для сущности %s", entity_id)
     
+    # Схема для сервиса запроса компонентов
+    query_schema = vol.Schema({
+        vol.Optional("status"): vol.All(
+            cv.ensure_list,
+            [vol.In([MAINTENANCE_STATUS_OK, MAINTENANCE_STATUS_DUE, MAINTENANCE_STATUS_OVERDUE])],
+        ),
+        vol.Optional("area_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("label_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("days_min"): vol.Coerce(int),
+        vol.Optional("days_max"): vol.Coerce(int),
+        vol.Optional("sort", default=SORT_DAYS): vol.In([SORT_DAYS, SORT_NAME]),
+        vol.Optional("reverse", default=False): cv.boolean,
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    })
+    
+    async def handle_query(call: ServiceCall) -> ServiceResponse:
+        """Обработка сервиса запроса компонентов по индексам."""
+        items = hass.data[DATA_INDEX].query(
+            dt_util.now().date(),
+            statuses=call.data.get("status"),
+            device_ids=call.data.get("device_id"),
+            area_ids=call.data.get("area_id"),
+            labels=call.data.get("label_id"),
+            days_min=call.data.get("days_min"),
+            days_max=call.data.get("days_max"),
+            sort=call.data["sort"],
+            reverse=call.data["reverse"],
+            limit=call.data.get("limit"),
+        )
+        return {"items": items, "count": len(items)}
+    
     # Регистрируем сервисы только если они ещё не зарегистрированы
     if not hass.services.has_service(DOMAIN, "perform_maintenance"):
         hass.services.async_register(
@@ -133,25 +265,27 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             handle_set_last_maintenance,
             schema=set_last_maintenance_schema,
         )
+    
+    if not hass.services.has_service(DOMAIN, "query"):
+        hass.services.async_register(
+            DOMAIN,
+            "query",
+            handle_query,
+            schema=query_schema,
+            supports_response=SupportsResponse.ONLY,
+        )
 
 
 def _find_coordinator_by_entity_id(hass: HomeAssistant, entity_id: str) -> MaintenanceCoordinator | None:
     """Найти координатор по ID сущности."""
-    # Проходим по всем записям интеграции
-    for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
-        if DATA_COORDINATOR in entry_data:
-            coordinator = entry_data[DATA_COORDINATOR]
-            
-            # Проверяем, относится ли entity_id к этому координатору
-            entry = coordinator.entry
-            component_name = entry.data.get("name", "")
-            component_name_safe = component_name.lower().replace(" ", "_")
-            
-            # Проверяем оба типа сенсоров
-            expected_status_id = f"sensor.{component_name_safe}_m_status"
-            expected_days_id = f"sensor.{component_name_safe}_m_days"
-            
-            if entity_id == expected_status_id or entity_id == expected_days_id:
-                return coordinator
-    
-    return None 
\ No newline at end of file
+    # Сущность находится через реестр, так как после переименования
+    # компонента её entity_id уже не совпадает с названием
+    entity = async_get_entity_registry(hass).async_get(entity_id)
+    if entity is None or entity.platform != DOMAIN:
+        return None
+    
+    entry_data = hass.data.get(DOMAIN, {}).get(entity.config_entry_id)
+    if entry_data and DATA_COORDINATOR in entry_data:
+        return entry_data[DATA_COORDINATOR]
+    
+    return None
\ No newline at end of file
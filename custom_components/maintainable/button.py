@@ -6,7 +6,7 @@ from typing import Any
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -40,6 +40,8 @@ async def async_setup_entry(
 class MaintenanceButton(CoordinatorEntity, ButtonEntity):
     """Кнопка для выполнения обслуживания."""
 
+    _name_suffix = " - Выполнить обслуживание"
+
     def __init__(
         self,
         coordinator: MaintenanceCoordinator,
@@ -52,7 +54,7 @@ class MaintenanceButton(CoordinatorEntity, ButtonEntity):
         component_name_safe = self._component_name.lower().replace(" ", "_")
         
         self._attr_unique_id = f"{config_entry.entry_id}{BUTTON_SUFFIX}"
-        self._attr_name = f"{self._component_name} - Выполнить обслуживание"
+        self._attr_name = f"{self._component_name}{self._name_suffix}"
         # Отключаем has_entity_name для правильного именования
         self._attr_has_entity_name = False
         self._attr_icon = "mdi:wrench"
@@ -91,6 +93,15 @@ class MaintenanceButton(CoordinatorEntity, ButtonEntity):
         """Доступность кнопки."""
         return self.coordinator.last_update_success
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Обработка обновления данных, включая переименование компонента."""
+        name = self.coordinator.data.get("name") if self.coordinator.data else None
+        if name and name != self._component_name:
+            self._component_name = name
+            self._attr_name = f"{name}{self._name_suffix}"
+        super()._handle_coordinator_update()
+
     async def async_press(self) -> None:
         """Обработка нажатия кнопки."""
         try:
@@ -0,0 +1,160 @@
+"""Условия по сенсорам, переводящие компонент в статус обслуживания."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_CONDITION_ABOVE,
+    CONF_CONDITION_BELOW,
+    CONF_CONDITION_ENTITY,
+    CONF_CONDITION_HYSTERESIS,
+    CONDITION_DEBOUNCE_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ConditionRule:
+    """Скомпилированное пороговое правило для одного сенсора."""
+
+    entity_id: str
+    above: float | None
+    below: float | None
+    hysteresis: float
+
+    def evaluate(self, value: float, active: bool) -> bool:
+        """Вернуть новое состояние правила с учётом гистерезиса."""
+        if active:
+            # Сброс только после возврата за порог с запасом гистерезиса
+            if self.above is not None and value > self.above - self.hysteresis:
+                return True
+            if self.below is not None and value < self.below + self.hysteresis:
+                return True
+            return False
+
+        if self.above is not None and value > self.above:
+            return True
+        if self.below is not None and value < self.below:
+            return True
+        return False
+
+
+def compile_rules(raw_rules: Iterable[dict[str, Any]] | None) -> tuple[ConditionRule, ...]:
+    """Скомпилировать правила из опций записи конфигурации."""
+    rules: list[ConditionRule] = []
+    for raw in raw_rules or ():
+        entity_id = raw.get(CONF_CONDITION_ENTITY)
+        above = raw.get(CONF_CONDITION_ABOVE)
+        below = raw.get(CONF_CONDITION_BELOW)
+        if not entity_id or (above is None and below is None):
+            _LOGGER.warning("Пропущено некорректное условие: %s", raw)
+            continue
+        rules.append(
+            ConditionRule(
+                entity_id=entity_id,
+                above=float(above) if above is not None else None,
+                below=float(below) if below is not None else None,
+                hysteresis=abs(float(raw.get(CONF_CONDITION_HYSTERESIS) or 0)),
+            )
+        )
+    return tuple(rules)
+
+
+class ConditionMonitor:
+    """Отслеживание сенсоров с пакетным пересчётом условий не чаще раза в интервал."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rules: tuple[ConditionRule, ...],
+        on_change: Callable[[bool, list[str]], None],
+    ) -> None:
+        """Инициализация монитора условий."""
+        self.hass = hass
+        self._on_change = on_change
+        self._rules_by_entity: dict[str, tuple[ConditionRule, ...]] = {}
+        for rule in rules:
+            self._rules_by_entity[rule.entity_id] = (
+                *self._rules_by_entity.get(rule.entity_id, ()),
+                rule,
+            )
+        self._active: dict[ConditionRule, bool] = {rule: False for rule in rules}
+        self._dirty: set[str] = set()
+        self._triggered = False
+        self._unsub: CALLBACK_TYPE | None = None
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CONDITION_DEBOUNCE_SECONDS,
+            immediate=False,
+            function=self._async_evaluate,
+        )
+
+    @property
+    def triggered(self) -> bool:
+        """Сработало ли хотя бы одно условие."""
+        return self._triggered
+
+    @property
+    def active_entities(self) -> list[str]:
+        """Сенсоры, условия которых сейчас активны."""
+        return sorted({rule.entity_id for rule, active in self._active.items() if active})
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Подписаться на изменения сенсоров и выполнить начальную оценку."""
+        self._dirty.update(self._rules_by_entity)
+        self._evaluate_dirty()
+        self._unsub = async_track_state_change_event(
+            self.hass, list(self._rules_by_entity), self._handle_state_change
+        )
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Отписаться от изменений сенсоров."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._debouncer.async_cancel()
+
+    @callback
+    def _handle_state_change(self, event: Event) -> None:
+        """Запомнить изменившийся сенсор и запланировать пересчёт, не создавая задач."""
+        self._dirty.add(event.data["entity_id"])
+        self._debouncer.async_schedule_call()
+
+    async def _async_evaluate(self) -> None:
+        """Пересчитать условия изменившихся за интервал сенсоров."""
+        self._evaluate_dirty()
+
+    @callback
+    def _evaluate_dirty(self) -> None:
+        """Пересчитать только правила изменившихся сенсоров."""
+        dirty, self._dirty = self._dirty, set()
+        for entity_id in dirty:
+            state = self.hass.states.get(entity_id)
+            if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+                continue
+            try:
+                value = float(state.state)
+            except ValueError:
+                _LOGGER.debug("Нечисловое состояние %s: %s", entity_id, state.state)
+                continue
+            for rule in self._rules_by_entity.get(entity_id, ()):
+                self._active[rule] = rule.evaluate(value, self._active[rule])
+
+        triggered = any(self._active.values())
+        if triggered != self._triggered:
+            self._triggered = triggered
+            _LOGGER.debug("Условие по сенсорам изменилось: %s", triggered)
+            self._on_change(triggered, self.active_entities)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 from datetime import datetime
 
@@ -14,6 +15,8 @@ from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.selector import (
     DeviceSelector,
     DeviceSelectorConfig,
+    EntitySelector,
+    EntitySelectorConfig,
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
@@ -24,11 +27,125 @@ from homeassistant.helpers.selector import (
     DateSelectorConfig,
 )
 
-from .const import DOMAIN, DEFAULT_MAINTENANCE_INTERVAL
+from .const import (
+    CONF_CONDITIONS,
+    CONF_CONDITION_ABOVE,
+    CONF_CONDITION_BELOW,
+    CONF_CONDITION_ENTITY,
+    CONF_CONDITION_HYSTERESIS,
+    CONF_RECURRENCE,
+    CONF_STAGES,
+    DEFAULT_MAINTENANCE_INTERVAL,
+    DOMAIN,
+)
+from .recurrence import parse_rule
+from .status import format_stages, parse_stages, stages_from_options
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _is_valid_recurrence(recurrence: str) -> bool:
+    """Проверить правило повторения."""
+    try:
+        parse_rule(recurrence)
+    except ValueError as err:
+        _LOGGER.warning("Некорректное правило повторения: %s", err)
+        return False
+    return True
+
+
+def _is_valid_stages(stages: str) -> bool:
+    """Проверить описание стадий предупреждений."""
+    try:
+        parse_stages(stages)
+    except ValueError as err:
+        _LOGGER.warning("Некорректные стадии: %s", err)
+        return False
+    return True
+
+
+def _normalize_stages(user_input: dict[str, Any]) -> str:
+    """Стадии в каноническом виде (по убыванию порога)."""
+    return format_stages(parse_stages(user_input.get(CONF_STAGES) or ""))
+
+
+def _unique_id(name: str) -> str:
+    """Уникальный ID записи по названию компонента."""
+    return f"{DOMAIN}_{name.lower().replace(' ', '_')}"
+
+
+def _is_name_taken(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry, name: str
+) -> bool:
+    """Занято ли название другим компонентом."""
+    unique_id = _unique_id(name)
+    return any(
+        other.unique_id == unique_id and other.entry_id != entry.entry_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+    )
+
+
+def _component_schema(data: Mapping[str, Any], options: Mapping[str, Any]) -> dict:
+    """Поля компонента, изменяемые без пересоздания записи."""
+    return {
+        vol.Required("name", default=data.get("name", "")): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.TEXT)
+        ),
+        vol.Required(
+            "maintenance_interval",
+            default=data.get("maintenance_interval", DEFAULT_MAINTENANCE_INTERVAL),
+        ): NumberSelector(
+            NumberSelectorConfig(
+                mode=NumberSelectorMode.BOX,
+                min=1,
+                unit_of_measurement="дней"
+            )
+        ),
+        vol.Optional(
+            CONF_RECURRENCE,
+            description={"suggested_value": data.get(CONF_RECURRENCE)},
+        ): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.TEXT)
+        ),
+        vol.Optional(
+            "device_id",
+            description={"suggested_value": data.get("device_id")},
+        ): DeviceSelector(
+            DeviceSelectorConfig()
+        ),
+        vol.Optional(
+            CONF_STAGES,
+            description={"suggested_value": format_stages(stages_from_options(options))},
+        ): TextSelector(
+            TextSelectorConfig(type=TextSelectorType.TEXT)
+        ),
+    }
+
+
+def _validate_component(
+    user_input: dict[str, Any], errors: dict[str, str]
+) -> dict[str, Any]:
+    """Проверить поля компонента и вернуть изменения для данных записи."""
+    name = user_input["name"].strip()
+    recurrence = (user_input.get(CONF_RECURRENCE) or "").strip() or None
+
+    if not name:
+        errors["name"] = "invalid_name"
+    elif user_input["maintenance_interval"] <= 0:
+        errors["maintenance_interval"] = "invalid_interval"
+    elif recurrence and not _is_valid_recurrence(recurrence):
+        errors[CONF_RECURRENCE] = "invalid_recurrence"
+    elif not _is_valid_stages(user_input.get(CONF_STAGES) or ""):
+        errors[CONF_STAGES] = "invalid_stages"
+
+    return {
+        "name": name,
+        "maintenance_interval": user_input["maintenance_interval"],
+        CONF_RECURRENCE: recurrence,
+        "device_id": user_input.get("device_id"),
+    }
+
+
 class MaintenableConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Обработка потока конфигурации для Maintainable."""
 
@@ -45,14 +162,17 @@ class MaintenableConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Проверяем корректность входных данных
                 name = user_input["name"].strip()
                 maintenance_interval = user_input["maintenance_interval"]
+                recurrence = (user_input.get(CONF_RECURRENCE) or "").strip() or None
                 
                 if not name:
                     errors["name"] = "invalid_name"
                 elif maintenance_interval <= 0:
                     errors["maintenance_interval"] = "invalid_interval"
+                elif recurrence and not _is_valid_recurrence(recurrence):
+                    errors[CONF_RECURRENCE] = "invalid_recurrence"
                 else:
                     # Создаём уникальный ID для этого компонента
-                    unique_id = f"{DOMAIN}_{name.lower().replace(' ', '_')}"
+                    unique_id = _unique_id(name)
                     
                     await self.async_set_unique_id(unique_id)
                     self._abort_if_unique_id_configured()
@@ -103,6 +223,7 @@ class MaintenableConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             "maintenance_interval": maintenance_interval,
                             "device_id": user_input.get("device_id"),
                             "last_maintenance_date": last_maintenance_str,
+                            CONF_RECURRENCE: recurrence,
                         },
                     )
                     
@@ -127,6 +248,9 @@ class MaintenableConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         unit_of_measurement="дней"
                     )
                 ),
+            vol.Optional(CONF_RECURRENCE): TextSelector(
+                TextSelectorConfig(type=TextSelectorType.TEXT)
+            ),
             vol.Optional("last_maintenance_date"): DateSelector(
                 DateSelectorConfig()
             ),
@@ -141,6 +265,34 @@ class MaintenableConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Изменение параметров компонента без пересоздания записи."""
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            data = _validate_component(user_input, errors)
+            if not errors and _is_name_taken(self.hass, entry, data["name"]):
+                errors["name"] = "name_exists"
+            if not errors:
+                # Одно обновление записи - координатор применит его без перезагрузки
+                self.hass.config_entries.async_update_entry(
+                    entry,
+                    unique_id=_unique_id(data["name"]),
+                    title=data["name"],
+                    data={**entry.data, **data},
+                    options={**entry.options, CONF_STAGES: _normalize_stages(user_input)},
+                )
+                return self.async_abort(reason="reconfigure_successful")
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=vol.Schema(_component_schema(entry.data, entry.options)),
+            errors=errors,
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(
@@ -156,20 +308,129 @@ class MaintenableOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Инициализация обработчика опций."""
         self.config_entry = config_entry
+        self._data: dict[str, Any] = {}
+        self._options: dict[str, Any] = {}
+        self._pending: list[str] = []
+        self._conditions: list[dict[str, Any]] = []
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Управление опциями."""
+        errors: dict[str, str] = {}
+        entry = self.config_entry
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            self._data = _validate_component(user_input, errors)
+            if not errors and _is_name_taken(self.hass, entry, self._data["name"]):
+                errors["name"] = "name_exists"
+            if not errors:
+                self._options = {
+                    "enable_notifications": user_input.get("enable_notifications", False),
+                    CONF_STAGES: _normalize_stages(user_input),
+                }
+                # Пороги каждого выбранного сенсора задаются отдельным шагом
+                self._pending = list(dict.fromkeys(user_input.get("condition_entities") or []))
+                self._conditions = []
+                if self._pending:
+                    return await self.async_step_condition()
+                return self._async_finish()
 
+        options = entry.options
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
+                **_component_schema(entry.data, options),
                 vol.Optional(
                     "enable_notifications",
-                    default=self.config_entry.options.get("enable_notifications", False),
+                    default=options.get("enable_notifications", False),
                 ): bool,
+                vol.Optional(
+                    "condition_entities",
+                    default=list(dict.fromkeys(
+                        condition[CONF_CONDITION_ENTITY]
+                        for condition in options.get(CONF_CONDITIONS) or []
+                    )),
+                ): EntitySelector(
+                    EntitySelectorConfig(domain="sensor", multiple=True)
+                ),
             }),
-        ) 
\ No newline at end of file
+            errors=errors,
+        )
+
+    async def async_step_condition(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Пороги условия для очередного выбранного сенсора."""
+        errors: dict[str, str] = {}
+        entity_id = self._pending[0]
+
+        if user_input is not None:
+            above = user_input.get(CONF_CONDITION_ABOVE)
+            below = user_input.get(CONF_CONDITION_BELOW)
+            if above is None and below is None:
+                errors["base"] = "invalid_condition"
+            elif above is not None and below is not None and below >= above:
+                errors["base"] = "invalid_condition"
+            else:
+                self._conditions.append(
+                    {
+                        CONF_CONDITION_ENTITY: entity_id,
+                        CONF_CONDITION_ABOVE: above,
+                        CONF_CONDITION_BELOW: below,
+                        CONF_CONDITION_HYSTERESIS: user_input.get(CONF_CONDITION_HYSTERESIS, 0),
+                    }
+                )
+                self._pending.pop(0)
+                if self._pending:
+                    return await self.async_step_condition()
+                return self._async_finish()
+
+        # Подставляем сохранённые пороги этого сенсора, если он уже отслеживался
+        current = next(
+            (
+                condition
+                for condition in self.config_entry.options.get(CONF_CONDITIONS) or []
+                if condition[CONF_CONDITION_ENTITY] == entity_id
+            ),
+            {},
+        )
+        return self.async_show_form(
+            step_id="condition",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_CONDITION_ABOVE,
+                    description={"suggested_value": current.get(CONF_CONDITION_ABOVE)},
+                ): NumberSelector(
+                    NumberSelectorConfig(mode=NumberSelectorMode.BOX, step="any")
+                ),
+                vol.Optional(
+                    CONF_CONDITION_BELOW,
+                    description={"suggested_value": current.get(CONF_CONDITION_BELOW)},
+                ): NumberSelector(
+                    NumberSelectorConfig(mode=NumberSelectorMode.BOX, step="any")
+                ),
+                vol.Optional(
+                    CONF_CONDITION_HYSTERESIS,
+                    default=current.get(CONF_CONDITION_HYSTERESIS, 0),
+                ): NumberSelector(
+                    NumberSelectorConfig(mode=NumberSelectorMode.BOX, min=0, step="any")
+                ),
+            }),
+            description_placeholders={"entity_id": entity_id},
+            errors=errors,
+        )
+
+    @callback
+    def _async_finish(self) -> FlowResult:
+        """Сохранить данные и опции одним изменением записи."""
+        options = {**self._options, CONF_CONDITIONS: self._conditions}
+        # Координатор получает одно инкрементальное обновление
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            unique_id=_unique_id(self._data["name"]),
+            title=self._data["name"],
+            data={**self.config_entry.data, **self._data},
+            options=options,
+        )
+        return self.async_create_entry(title="", data=options)
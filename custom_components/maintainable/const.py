@@ -1,14 +1,15 @@
 """Константы для интеграции Maintainable."""
 from __future__ import annotations
 
-from homeassistant.const import Platform
+# Модуль не импортирует Home Assistant: он используется и автономным отчётом (scripts/)
 
 # Основные константы
 DOMAIN = "maintainable"
-PLATFORMS = [Platform.SENSOR, Platform.BUTTON]
+PLATFORMS = ["sensor", "button"]
 
 # Ключи для хранения данных
 DATA_COORDINATOR = "coordinator"
+DATA_INDEX = f"{DOMAIN}_index"
 
 # Состояния обслуживания
 MAINTENANCE_STATUS_OK = "ok"
@@ -17,6 +18,8 @@ MAINTENANCE_STATUS_OVERDUE = "overdue"
 
 # Пороги для статусов (в днях)
 DUE_THRESHOLD = 7  # За 7 дней до срока - статус "due"
+CONF_STAGES = "stages"  # Стадии предупреждений компонента, например "due:14,urgent:3,overdue:-1"
+STAGE_CONDITION = "condition"  # Стадия компонента, ставшего "due" из-за условия по сенсорам
 
 # Суффиксы для сущностей
 STATUS_SUFFIX = "_m_status"
@@ -27,6 +30,32 @@ BUTTON_SUFFIX = "_maintenance_button"
 EVENT_MAINTENANCE_DUE = "maintainable_due"
 EVENT_MAINTENANCE_OVERDUE = "maintainable_overdue"
 EVENT_MAINTENANCE_COMPLETED = "maintainable_completed"
+EVENT_MAINTENANCE_STAGE = "maintainable_stage"
+
+# Календарное правило повторения (подмножество RRULE)
+CONF_RECURRENCE = "recurrence"
+
+# Условия по сенсорам
+CONF_CONDITIONS = "conditions"
+CONF_CONDITION_ENTITY = "entity_id"
+CONF_CONDITION_ABOVE = "above"
+CONF_CONDITION_BELOW = "below"
+CONF_CONDITION_HYSTERESIS = "hysteresis"
+CONDITION_DEBOUNCE_SECONDS = 10  # Пауза перед пересчётом условий после изменения сенсора
+
+# Экспорт состояния (configuration.yaml)
+CONF_EXPORT = "export"
+CONF_EXPORT_MQTT_TOPIC = "mqtt_topic"
+CONF_EXPORT_FILE = "file"
+CONF_EXPORT_MAX_BYTES = "max_bytes"
+CONF_EXPORT_BACKUP_COUNT = "backup_count"
+CONF_EXPORT_BATCH_SIZE = "batch_size"
+CONF_EXPORT_FLUSH_INTERVAL = "flush_interval"
+CONF_EXPORT_MAX_QUEUE = "max_queue"
+DATA_EXPORTER = f"{DOMAIN}_exporter"
+
+# Сигнал обновления данных компонента
+SIGNAL_COMPONENT_UPDATED = f"{DOMAIN}_component_updated"
 
 # Конфигурация по умолчанию
 DEFAULT_MAINTENANCE_INTERVAL = 30  # дней 
\ No newline at end of file
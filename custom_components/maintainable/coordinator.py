@@ -1,24 +1,46 @@
 """Координатор данных для интеграции Maintainable."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import Callable
 from datetime import datetime, date, timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .condition import ConditionMonitor, compile_rules
 from .const import (
+    CONF_CONDITIONS,
+    CONF_RECURRENCE,
+    DATA_INDEX,
     DOMAIN,
     MAINTENANCE_STATUS_OK,
     MAINTENANCE_STATUS_DUE,
     MAINTENANCE_STATUS_OVERDUE,
-    DUE_THRESHOLD,
     EVENT_MAINTENANCE_DUE,
     EVENT_MAINTENANCE_OVERDUE,
     EVENT_MAINTENANCE_COMPLETED,
+    EVENT_MAINTENANCE_STAGE,
+    SIGNAL_COMPONENT_UPDATED,
+    STAGE_CONDITION,
+    STATUS_SUFFIX,
+)
+from .index import IndexedComponent
+from .status import (
+    Stage,
+    StageTable,
+    build_stage_table,
+    days_until,
+    next_maintenance_date,
+    stages_from_options,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,108 +64,337 @@ class MaintenanceCoordinator(DataUpdateCoordinator):
         self.store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}_{entry.entry_id}")
         self._data: dict[str, Any] = {}
         self._previous_status: dict[str, str] = {}
+        # Кэш сохранённой записи: диск читается только при первом обновлении
+        self._stored_data: dict[str, Any] | None = None
+        # Очередь изменений записи, применяемых одной записью на диск
+        self._pending: list[tuple[Callable[[dict[str, Any]], Any], asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        # Предвычисленная таблица смен стадий и запланированный пересчёт
+        self._stage_key: tuple[date, tuple[Stage, ...]] | None = None
+        self._stage_table: StageTable | None = None
+        self._previous_stage: str | None = None
+        self._stage_wake_date: date | None = None
+        self._unsub_stage_wake: CALLBACK_TYPE | None = None
+        self._conditions = entry.options.get(CONF_CONDITIONS)
+        self.condition_monitor: ConditionMonitor | None = None
+        if rules := compile_rules(self._conditions):
+            self.condition_monitor = ConditionMonitor(hass, rules, self._handle_condition_change)
+
+    @callback
+    def async_start_conditions(self) -> None:
+        """Запустить отслеживание условий по сенсорам."""
+        if self.condition_monitor is not None:
+            self.condition_monitor.async_start()
+
+    @callback
+    def async_stop_conditions(self) -> None:
+        """Остановить отслеживание условий по сенсорам."""
+        if self.condition_monitor is not None:
+            self.condition_monitor.async_stop()
+
+    async def async_apply_entry_update(self) -> None:
+        """Применить изменённые настройки записи без её перезагрузки.
+
+        Запись компонента обновляется через общую очередь изменений, поэтому
+        правка настроек даёт не больше одной записи на диск и одно обновление данных.
+        """
+        conditions = self.entry.options.get(CONF_CONDITIONS)
+        if conditions != self._conditions:
+            # Перекомпилируем только правила условий
+            self._conditions = conditions
+            self.async_stop_conditions()
+            self.condition_monitor = None
+            if rules := compile_rules(conditions):
+                self.condition_monitor = ConditionMonitor(self.hass, rules, self._handle_condition_change)
+                self.async_start_conditions()
+
+        def mutation(stored_data: dict[str, Any]) -> None:
+            stored_data["name"] = self.entry.data.get("name", stored_data.get("name"))
+            stored_data["maintenance_interval"] = self.entry.data.get(
+                "maintenance_interval", stored_data.get("maintenance_interval")
+            )
+            stored_data[CONF_RECURRENCE] = self.entry.data.get(CONF_RECURRENCE)
+
+        await self._async_mutate(mutation)
+
+    @callback
+    def _handle_condition_change(self, triggered: bool, entities: list[str]) -> None:
+        """Обработка срабатывания или сброса условия по сенсорам."""
+        _LOGGER.info("Компонент %s: условие по сенсорам %s (%s)",
+                     self.entry.data.get("name"), "сработало" if triggered else "сброшено", entities)
+        self.hass.async_create_task(self.async_request_refresh())
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Обновление данных."""
         try:
-            # Загружаем сохранённые данные
-            stored_data = await self.store.async_load()
-            if stored_data is None:
-                # При первом запуске используем дату из конфигурации или текущую
-                last_maintenance_date = self.entry.data.get("last_maintenance_date")
-                if not last_maintenance_date:
-                    last_maintenance_date = datetime.now().isoformat()
-                
-                stored_data = {
-                    "last_maintenance_date": last_maintenance_date,
-                    "maintenance_interval": self.entry.data.get("maintenance_interval", 30),
-                    "name": self.entry.data.get("name", "Компонент"),
-                }
-                
-                # Сохраняем начальные данные
-                await self.store.async_save(stored_data)
-                
-                _LOGGER.info("Создан новый компонент: %s, дата последнего обслуживания: %s", 
-                           stored_data["name"], last_maintenance_date)
-
-            # Вычисляем текущий статус
-            last_maintenance = datetime.fromisoformat(stored_data["last_maintenance_date"])
-            interval = stored_data["maintenance_interval"]
-            now = datetime.now()
+            stored_data = await self._async_load_stored_data()
+            return self._compute_data(stored_data)
+        except Exception as err:
+            raise UpdateFailed(f"Ошибка обновления данных: {err}") from err
+
+    async def _async_load_stored_data(self) -> dict[str, Any]:
+        """Загрузить сохранённую запись компонента (один раз за время работы)."""
+        if self._stored_data is not None:
+            return self._stored_data
+
+        # Загружаем сохранённые данные
+        stored_data = await self.store.async_load()
+        if stored_data is None:
+            # При первом запуске используем дату из конфигурации или текущую
+            last_maintenance_date = self.entry.data.get("last_maintenance_date")
+            if not last_maintenance_date:
+                last_maintenance_date = dt_util.now().isoformat()
+            
+            stored_data = {
+                "last_maintenance_date": last_maintenance_date,
+                "maintenance_interval": self.entry.data.get("maintenance_interval", 30),
+                "name": self.entry.data.get("name", "Компонент"),
+                CONF_RECURRENCE: self.entry.data.get(CONF_RECURRENCE),
+            }
             
-            next_maintenance = last_maintenance + timedelta(days=interval)
-            days_until_maintenance = (next_maintenance.date() - now.date()).days
+            # Сохраняем начальные данные
+            await self.store.async_save(stored_data)
             
-            _LOGGER.debug("Компонент %s: последнее обслуживание %s, интервал %d дней, дней до обслуживания: %d", 
-                         stored_data["name"], last_maintenance.date(), interval, days_until_maintenance)
+            _LOGGER.info("Создан новый компонент: %s, дата последнего обслуживания: %s", 
+                       stored_data["name"], last_maintenance_date)
+
+        self._stored_data = stored_data
+        return stored_data
+
+    @callback
+    def _compute_data(self, stored_data: dict[str, Any]) -> dict[str, Any]:
+        """Вычислить статус компонента по сохранённой записи."""
+        # Вычисляем текущий статус
+        last_maintenance = datetime.fromisoformat(stored_data["last_maintenance_date"])
+        interval = stored_data["maintenance_interval"]
+        # Те же часы (часовой пояс Home Assistant), что и у планировщика смены стадий
+        today = dt_util.now().date()
+        
+        recurrence = stored_data.get(CONF_RECURRENCE) or self.entry.data.get(CONF_RECURRENCE)
+        next_maintenance = next_maintenance_date(last_maintenance, interval, recurrence)
+        days_until_maintenance = days_until(next_maintenance, today)
+        
+        _LOGGER.debug("Компонент %s: последнее обслуживание %s, интервал %d дней, дней до обслуживания: %d", 
+                     stored_data["name"], last_maintenance.date(), interval, days_until_maintenance)
+        
+        # Таблица смен стадий пересчитывается только при изменении даты или стадий
+        stage_key = (next_maintenance.date(), stages_from_options(self.entry.options))
+        if stage_key != self._stage_key:
+            self._stage_key = stage_key
+            self._stage_table = build_stage_table(*stage_key)
+
+        # Определяем стадию и статус
+        stage, status = self._stage_table.lookup(today)
+        next_stage_change = self._stage_table.next_change(today)
+        self._async_schedule_stage_wake(next_stage_change)
+
+        # Сработавшее условие по сенсорам делает компонент требующим обслуживания
+        condition_triggered = bool(self.condition_monitor and self.condition_monitor.triggered)
+        if condition_triggered and status == MAINTENANCE_STATUS_OK:
+            # Стадия меняется вместе со статусом, чтобы атрибуты, события и экспорт совпадали
+            status = MAINTENANCE_STATUS_DUE
+            stage = STAGE_CONDITION
+
+        # Проверяем изменение статуса и отправляем события
+        entry_id = self.entry.entry_id
+        previous_status = self._previous_status.get(entry_id)
+        
+        if previous_status != status:
+            component_name = stored_data.get("name", "Компонент")
             
-            # Определяем статус
-            if days_until_maintenance < 0:
-                status = MAINTENANCE_STATUS_OVERDUE
-            elif days_until_maintenance <= DUE_THRESHOLD:
-                status = MAINTENANCE_STATUS_DUE
-            else:
-                status = MAINTENANCE_STATUS_OK
-
-            # Проверяем изменение статуса и отправляем события
-            entry_id = self.entry.entry_id
-            previous_status = self._previous_status.get(entry_id)
+            if status == MAINTENANCE_STATUS_DUE and previous_status != MAINTENANCE_STATUS_DUE:
+                self.hass.bus.async_fire(EVENT_MAINTENANCE_DUE, {
+                    "entity_id": self._event_entity_id(component_name),
+                    "component_name": component_name,
+                    "days_until": days_until_maintenance,
+                })
+            elif status == MAINTENANCE_STATUS_OVERDUE and previous_status != MAINTENANCE_STATUS_OVERDUE:
+                self.hass.bus.async_fire(EVENT_MAINTENANCE_OVERDUE, {
+                    "entity_id": self._event_entity_id(component_name),
+                    "component_name": component_name,
+                    "days_overdue": abs(days_until_maintenance),
+                })
             
-            if previous_status != status:
+            self._previous_status[entry_id] = status
+
+        previous_stage = self._previous_stage
+        if previous_stage != stage:
+            if stage != MAINTENANCE_STATUS_OK:
                 component_name = stored_data.get("name", "Компонент")
-                
-                if status == MAINTENANCE_STATUS_DUE and previous_status != MAINTENANCE_STATUS_DUE:
-                    self.hass.bus.async_fire(EVENT_MAINTENANCE_DUE, {
-                        "entity_id": f"sensor.{component_name.lower().replace(' ', '_')}_m_status",
-                        "component_name": component_name,
-                        "days_until": days_until_maintenance,
-                    })
-                elif status == MAINTENANCE_STATUS_OVERDUE and previous_status != MAINTENANCE_STATUS_OVERDUE:
-                    self.hass.bus.async_fire(EVENT_MAINTENANCE_OVERDUE, {
-                        "entity_id": f"sensor.{component_name.lower().replace(' ', '_')}_m_status", 
-                        "component_name": component_name,
-                        "days_overdue": abs(days_until_maintenance),
-                    })
-                
-                self._previous_status[entry_id] = status
-
-            return {
-                "status": status,
-                "days_until_maintenance": days_until_maintenance,
-                "last_maintenance_date": stored_data["last_maintenance_date"],
-                "maintenance_interval": stored_data["maintenance_interval"],
-                "name": stored_data["name"],
-                "next_maintenance_date": next_maintenance.isoformat(),
-            }
+                self.hass.bus.async_fire(EVENT_MAINTENANCE_STAGE, {
+                    "entity_id": self._event_entity_id(component_name),
+                    "component_name": component_name,
+                    "stage": stage,
+                    "previous_stage": previous_stage,
+                    "days_until": days_until_maintenance,
+                })
+            self._previous_stage = stage
 
-        except Exception as err:
-            raise UpdateFailed(f"Ошибка обновления данных: {err}") from err
+        data = {
+            "status": status,
+            "stage": stage,
+            "next_stage_change": next_stage_change.isoformat() if next_stage_change else None,
+            "days_until_maintenance": days_until_maintenance,
+            "last_maintenance_date": stored_data["last_maintenance_date"],
+            "maintenance_interval": stored_data["maintenance_interval"],
+            "name": stored_data["name"],
+            "next_maintenance_date": next_maintenance.isoformat(),
+            "recurrence": recurrence,
+            "condition_triggered": condition_triggered,
+            "condition_entities": (
+                self.condition_monitor.active_entities if self.condition_monitor else []
+            ),
+        }
+        self._async_index(data)
+        async_dispatcher_send(self.hass, SIGNAL_COMPONENT_UPDATED, self.entry.entry_id, data)
+        return data
+
+    @callback
+    def _async_schedule_stage_wake(self, next_change: date | None) -> None:
+        """Запланировать пересчёт точно на дату следующей смены стадии."""
+        if next_change == self._stage_wake_date:
+            return
+        self.async_cancel_stage_wake()
+        self._stage_wake_date = next_change
+        if next_change is not None:
+            self._unsub_stage_wake = async_track_point_in_time(
+                self.hass, self._handle_stage_wake, dt_util.start_of_local_day(next_change)
+            )
+
+    @callback
+    def async_cancel_stage_wake(self) -> None:
+        """Отменить запланированный пересчёт."""
+        if self._unsub_stage_wake is not None:
+            self._unsub_stage_wake()
+            self._unsub_stage_wake = None
+        self._stage_wake_date = None
+
+    @callback
+    def _handle_stage_wake(self, now: datetime) -> None:
+        """Наступила дата смены стадии."""
+        self._unsub_stage_wake = None
+        self._stage_wake_date = None
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _status_entity_id(self) -> str | None:
+        """Фактический entity_id сенсора статуса по реестру сущностей."""
+        return er.async_get(self.hass).async_get_entity_id(
+            "sensor", DOMAIN, f"{self.entry.entry_id}{STATUS_SUFFIX}"
+        )
+
+    @callback
+    def _event_entity_id(self, component_name: str) -> str:
+        """entity_id для событий: из реестра, а до регистрации сенсора - по имени."""
+        return self._status_entity_id() or (
+            f"sensor.{component_name.lower().replace(' ', '_')}_m_status"
+        )
+
+    @callback
+    def async_update_index(self) -> None:
+        """Обновить запись компонента в индексе (например, после изменения реестров)."""
+        if self.data:
+            self._async_index(self.data)
+
+    @callback
+    def _async_index(self, data: dict[str, Any]) -> None:
+        """Записать состояние компонента в общий индекс."""
+        index = self.hass.data.get(DATA_INDEX)
+        if index is None:
+            return
+
+        device_id = self.entry.data.get("device_id")
+        area_id = None
+        labels: set[str] = set()
+        if device_id and (device := dr.async_get(self.hass).async_get(device_id)):
+            area_id = device.area_id
+            labels.update(getattr(device, "labels", ()))
+
+        entity_id = self._status_entity_id()
+        if entity_id and (entity := er.async_get(self.hass).async_get(entity_id)):
+            area_id = entity.area_id or area_id
+            labels.update(getattr(entity, "labels", ()))
+
+        index.update(
+            IndexedComponent(
+                entry_id=self.entry.entry_id,
+                name=data["name"],
+                entity_id=entity_id,
+                status=data["status"],
+                next_maintenance=datetime.fromisoformat(data["next_maintenance_date"]).date(),
+                last_maintenance_date=data["last_maintenance_date"],
+                device_id=device_id,
+                area_id=area_id,
+                labels=frozenset(labels),
+            )
+        )
+
+    async def _async_mutate(self, mutation: Callable[[dict[str, Any]], Any]) -> Any:
+        """Поставить изменение записи в очередь компонента и дождаться результата.
+
+        Изменения применяются строго по очереди. Все изменения, накопившиеся
+        за время записи на диск, объединяются в одну запись и одно обновление данных.
+        """
+        future: asyncio.Future = self.hass.loop.create_future()
+        self._pending.append((mutation, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = self.hass.async_create_task(self._async_flush())
+        return await future
+
+    async def _async_flush(self) -> None:
+        """Применить накопленные изменения записи."""
+        while self._pending:
+            batch, self._pending = self._pending, []
+            outcomes: list[tuple[asyncio.Future, Any, Exception | None]] = []
+            try:
+                original = await self._async_load_stored_data()
+                stored_data = dict(original)
+                for mutation, future in batch:
+                    # Каждое изменение применяется к копии, чтобы ошибка не оставила запись наполовину изменённой
+                    candidate = dict(stored_data)
+                    try:
+                        result = mutation(candidate)
+                    except Exception as err:  # noqa: BLE001
+                        outcomes.append((future, None, err))
+                        continue
+                    stored_data = candidate
+                    outcomes.append((future, result, None))
+
+                if any(error is None for _, _, error in outcomes):
+                    if stored_data != original:
+                        await self.store.async_save(stored_data)
+                        self._stored_data = stored_data
+                    self.async_set_updated_data(self._compute_data(stored_data))
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.error("Ошибка при сохранении данных %s: %s", self.entry.data.get("name"), err)
+                outcomes = [(future, None, err) for _, future in batch]
+
+            for future, result, error in outcomes:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
 
     async def async_perform_maintenance(self) -> None:
         """Выполнить обслуживание - установить текущую дату как дату последнего обслуживания."""
         try:
-            # Загружаем текущие данные
-            stored_data = await self.store.async_load()
-            if stored_data is None:
-                stored_data = {}
+            def mutation(stored_data: dict[str, Any]) -> str:
+                # Обновляем дату последнего обслуживания
+                stored_data["last_maintenance_date"] = dt_util.now().isoformat()
+                return stored_data["last_maintenance_date"]
 
-            # Обновляем дату последнего обслуживания
-            stored_data["last_maintenance_date"] = datetime.now().isoformat()
-            
-            # Сохраняем
-            await self.store.async_save(stored_data)
+            maintenance_date = await self._async_mutate(mutation)
             
             # Отправляем событие о выполненном обслуживании
-            component_name = stored_data.get("name", "Компонент")
+            component_name = self._stored_data.get("name", "Компонент")
             self.hass.bus.async_fire(EVENT_MAINTENANCE_COMPLETED, {
-                "entity_id": f"sensor.{component_name.lower().replace(' ', '_')}_m_status",
+                "entity_id": self._event_entity_id(component_name),
                 "component_name": component_name,
-                "maintenance_date": stored_data["last_maintenance_date"],
+                "maintenance_date": maintenance_date,
             })
             
-            # Обновляем данные
-            await self.async_request_refresh()
-            
             _LOGGER.info("Обслуживание выполнено для %s", component_name)
 
         except Exception as err:
@@ -153,24 +404,16 @@ class MaintenanceCoordinator(DataUpdateCoordinator):
     async def async_set_maintenance_date(self, maintenance_date: datetime) -> None:
         """Установить дату последнего обслуживания."""
         try:
-            # Загружаем текущие данные
-            stored_data = await self.store.async_load()
-            if stored_data is None:
-                stored_data = {}
+            def mutation(stored_data: dict[str, Any]) -> None:
+                # Обновляем дату последнего обслуживания
+                stored_data["last_maintenance_date"] = maintenance_date.isoformat()
 
-            # Обновляем дату последнего обслуживания
-            stored_data["last_maintenance_date"] = maintenance_date.isoformat()
-            
-            # Сохраняем
-            await self.store.async_save(stored_data)
-            
-            # Обновляем данные
-            await self.async_request_refresh()
+            await self._async_mutate(mutation)
             
-            component_name = stored_data.get("name", "Компонент")
+            component_name = self._stored_data.get("name", "Компонент")
             _LOGGER.info("Дата последнего обслуживания установлена для %s: %s", 
                         component_name, maintenance_date.date())
 
         except Exception as err:
             _LOGGER.error("Ошибка при установке даты обслуживания: %s", err)
-            raise 
\ No newline at end of file
+            raise
\ No newline at end of file
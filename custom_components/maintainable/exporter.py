@@ -0,0 +1,254 @@
+"""Пакетный экспорт состояния компонентов в формате JSON Lines (MQTT или файл)."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_EXPORT_BACKUP_COUNT,
+    CONF_EXPORT_BATCH_SIZE,
+    CONF_EXPORT_FILE,
+    CONF_EXPORT_FLUSH_INTERVAL,
+    CONF_EXPORT_MAX_BYTES,
+    CONF_EXPORT_MAX_QUEUE,
+    CONF_EXPORT_MQTT_TOPIC,
+    DOMAIN,
+    SIGNAL_COMPONENT_UPDATED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}_export"
+
+RECORD_SNAPSHOT = "snapshot"
+RECORD_DELTA = "delta"
+
+
+class ExportSink(ABC):
+    """Получатель пакетов экспорта."""
+
+    @abstractmethod
+    async def async_write(self, lines: list[str]) -> None:
+        """Записать пакет строк. Успешное завершение считается подтверждением."""
+
+
+class MqttSink(ExportSink):
+    """Публикация пакета одним сообщением в топик MQTT."""
+
+    def __init__(self, hass: HomeAssistant, topic: str) -> None:
+        """Инициализация получателя MQTT."""
+        self.hass = hass
+        self.topic = topic
+
+    async def async_write(self, lines: list[str]) -> None:
+        """Опубликовать пакет с QoS 1."""
+        from homeassistant.components import mqtt
+
+        await mqtt.async_publish(self.hass, self.topic, "\n".join(lines), qos=1)
+
+
+class FileSink(ExportSink):
+    """Дозапись пакетов в локальный файл с ротацией по размеру."""
+
+    def __init__(self, hass: HomeAssistant, path: str, max_bytes: int, backup_count: int) -> None:
+        """Инициализация файлового получателя."""
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    async def async_write(self, lines: list[str]) -> None:
+        """Дописать пакет в файл вне цикла событий."""
+        await self.hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        payload = "".join(f"{line}\n" for line in lines)
+        if self.max_bytes and os.path.exists(self.path):
+            if os.path.getsize(self.path) + len(payload.encode()) > self.max_bytes:
+                self._rotate()
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for number in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{number}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{number + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class MaintenanceExporter:
+    """Экспорт снимков и переходов состояния всех компонентов.
+
+    Записи копятся в ограниченной очереди и отправляются пакетами. При
+    переполнении очередь сбрасывается и вместо накопленных изменений
+    отправляется полный снимок. Последний номер пакета сохраняется до его
+    отправки, поэтому после перезапуска (в том числе аварийного) нумерация
+    продолжается после него: номера могут пропускаться, но не повторяются.
+    """
+
+    def __init__(self, hass: HomeAssistant, sink: ExportSink, config: dict[str, Any]) -> None:
+        """Инициализация экспортёра."""
+        self.hass = hass
+        self.sink = sink
+        self.batch_size: int = config[CONF_EXPORT_BATCH_SIZE]
+        self.max_queue: int = config[CONF_EXPORT_MAX_QUEUE]
+        self.flush_interval = timedelta(seconds=config[CONF_EXPORT_FLUSH_INTERVAL])
+        self.store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._last_acked = 0
+        self._reserved = 0
+        self._queue: deque[dict[str, Any]] = deque()
+        self._inflight: list[dict[str, Any]] = []
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._resync = True
+        self._flushing = False
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    async def async_start(self) -> None:
+        """Восстановить номер последовательности и подписаться на обновления."""
+        stored = await self.store.async_load()
+        if stored:
+            self._last_acked = self._reserved = stored.get("last_seq", 0)
+        _LOGGER.info("Экспорт запущен, продолжаем с записи %d", self._last_acked + 1)
+
+        self._unsubs.append(
+            async_dispatcher_connect(self.hass, SIGNAL_COMPONENT_UPDATED, self._handle_component_updated)
+        )
+        self._unsubs.append(
+            async_track_time_interval(self.hass, self._handle_interval, self.flush_interval)
+        )
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Отписаться от обновлений."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    @callback
+    def remove(self, entry_id: str) -> None:
+        """Забыть выгруженный компонент и его ещё не отправленные изменения."""
+        self._latest.pop(entry_id, None)
+        self._queue = deque(record for record in self._queue if record["entry_id"] != entry_id)
+
+    @callback
+    def _handle_component_updated(self, entry_id: str, data: dict[str, Any]) -> None:
+        """Поставить в очередь переход состояния компонента."""
+        previous = self._latest.get(entry_id)
+        self._latest[entry_id] = data
+        if self._resync or (
+            previous is not None
+            and previous["status"] == data["status"]
+            and previous.get("stage") == data.get("stage")
+            and previous["last_maintenance_date"] == data["last_maintenance_date"]
+            and previous["next_maintenance_date"] == data["next_maintenance_date"]
+        ):
+            return
+
+        record = _record(RECORD_DELTA, entry_id, data)
+        record["previous_status"] = previous["status"] if previous else None
+        if len(self._queue) >= self.max_queue:
+            # Получатель не успевает: заменяем накопленные изменения полным снимком
+            _LOGGER.warning("Очередь экспорта переполнена (%d), будет отправлен полный снимок", self.max_queue)
+            self._queue.clear()
+            self._resync = True
+            return
+        self._queue.append(record)
+        if len(self._queue) >= self.batch_size:
+            self.hass.async_create_task(self.async_flush())
+
+    async def _handle_interval(self, now: datetime) -> None:
+        """Периодическая отправка накопленных записей."""
+        await self.async_flush()
+
+    async def _async_handle_stop(self, event: Event) -> None:
+        """Отписаться и отправить остаток очереди при остановке Home Assistant."""
+        self._unsub_stop = None
+        self.async_stop()
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Отправить очередь пакетами до первой ошибки получателя."""
+        if self._flushing:
+            return
+        self._flushing = True
+        try:
+            if self._resync and not self._inflight:
+                self._queue = deque(
+                    _record(RECORD_SNAPSHOT, entry_id, data) for entry_id, data in self._latest.items()
+                )
+                self._resync = False
+
+            while self._inflight or self._queue:
+                if not self._inflight:
+                    # Номера назначаются при формировании пакета и не меняются при повторе
+                    for _ in range(min(self.batch_size, len(self._queue))):
+                        record = self._queue.popleft()
+                        record["seq"] = self._last_acked + len(self._inflight) + 1
+                        self._inflight.append(record)
+                try:
+                    if self._inflight[-1]["seq"] > self._reserved:
+                        # Номера резервируются в хранилище до того, как их увидит получатель
+                        await self.store.async_save({"last_seq": self._inflight[-1]["seq"]})
+                        self._reserved = self._inflight[-1]["seq"]
+                    await self.sink.async_write(
+                        [json.dumps(record, ensure_ascii=False) for record in self._inflight]
+                    )
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.warning("Не удалось отправить пакет экспорта, повтор позже: %s", err)
+                    return
+                self._last_acked = self._inflight[-1]["seq"]
+                self._inflight = []
+        finally:
+            self._flushing = False
+
+
+def _record(record_type: str, entry_id: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Запись экспорта по данным координатора."""
+    return {
+        "type": record_type,
+        "ts": dt_util.utcnow().isoformat(),
+        "entry_id": entry_id,
+        "name": data.get("name"),
+        "status": data.get("status"),
+        "stage": data.get("stage"),
+        "days_until_maintenance": data.get("days_until_maintenance"),
+        "last_maintenance_date": data.get("last_maintenance_date"),
+        "next_maintenance_date": data.get("next_maintenance_date"),
+    }
+
+
+def async_create_sink(hass: HomeAssistant, config: dict[str, Any]) -> ExportSink:
+    """Создать получателя по конфигурации экспорта."""
+    if topic := config.get(CONF_EXPORT_MQTT_TOPIC):
+        return MqttSink(hass, topic)
+    return FileSink(
+        hass,
+        hass.config.path(config[CONF_EXPORT_FILE]),
+        config[CONF_EXPORT_MAX_BYTES],
+        config[CONF_EXPORT_BACKUP_COUNT],
+    )
@@ -0,0 +1,221 @@
+"""Индексы компонентов в памяти для быстрых запросов по всему парку."""
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+SORT_DAYS = "days"
+SORT_NAME = "name"
+
+
+@dataclass(slots=True)
+class IndexedComponent:
+    """Запись о компоненте в индексе."""
+
+    entry_id: str
+    name: str
+    entity_id: str | None
+    status: str
+    next_maintenance: date
+    last_maintenance_date: str
+    device_id: str | None = None
+    area_id: str | None = None
+    labels: frozenset[str] = field(default_factory=frozenset)
+
+    def as_dict(self, today: date) -> dict[str, Any]:
+        """Представление для ответа сервиса."""
+        return {
+            "entry_id": self.entry_id,
+            "name": self.name,
+            "entity_id": self.entity_id,
+            "status": self.status,
+            "days_until_maintenance": (self.next_maintenance - today).days,
+            "next_maintenance_date": self.next_maintenance.isoformat(),
+            "last_maintenance_date": self.last_maintenance_date,
+            "device_id": self.device_id,
+            "area_id": self.area_id,
+            "labels": sorted(self.labels),
+        }
+
+
+class MaintenanceIndex:
+    """Вторичные индексы по статусу, устройству, зоне, метке и дате обслуживания.
+
+    Индексы обновляются координаторами при каждом пересчёте, поэтому запрос
+    затрагивает только подходящие компоненты, а не весь парк.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустых индексов."""
+        self._components: dict[str, IndexedComponent] = {}
+        self._by_status: dict[str, set[str]] = {}
+        self._by_device: dict[str, set[str]] = {}
+        self._by_area: dict[str, set[str]] = {}
+        self._by_label: dict[str, set[str]] = {}
+        # Отсортированный список (ординал следующей даты, entry_id)
+        self._by_next: list[tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        """Количество компонентов в индексе."""
+        return len(self._components)
+
+    def update(self, component: IndexedComponent) -> None:
+        """Добавить или обновить компонент."""
+        previous = self._components.get(component.entry_id)
+        if previous == component:
+            return
+        if previous is not None:
+            self._unindex(previous)
+        self._components[component.entry_id] = component
+        _add(self._by_status, component.status, component.entry_id)
+        _add(self._by_device, component.device_id, component.entry_id)
+        _add(self._by_area, component.area_id, component.entry_id)
+        for label in component.labels:
+            _add(self._by_label, label, component.entry_id)
+        insort(self._by_next, (component.next_maintenance.toordinal(), component.entry_id))
+
+    def remove(self, entry_id: str) -> None:
+        """Удалить компонент из индексов."""
+        if (component := self._components.pop(entry_id, None)) is not None:
+            self._unindex(component)
+
+    def _unindex(self, component: IndexedComponent) -> None:
+        _discard(self._by_status, component.status, component.entry_id)
+        _discard(self._by_device, component.device_id, component.entry_id)
+        _discard(self._by_area, component.area_id, component.entry_id)
+        for label in component.labels:
+            _discard(self._by_label, label, component.entry_id)
+        key = (component.next_maintenance.toordinal(), component.entry_id)
+        position = bisect_left(self._by_next, key)
+        if position < len(self._by_next) and self._by_next[position] == key:
+            del self._by_next[position]
+
+    def query(
+        self,
+        today: date,
+        *,
+        statuses: Iterable[str] | None = None,
+        device_ids: Iterable[str] | None = None,
+        area_ids: Iterable[str] | None = None,
+        labels: Iterable[str] | None = None,
+        days_min: int | None = None,
+        days_max: int | None = None,
+        sort: str = SORT_DAYS,
+        reverse: bool = False,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Найти компоненты по фильтрам.
+
+        Фильтры объединяются через И, значения внутри одного фильтра - через ИЛИ.
+        Множества индексов не копируются: перебирается самый маленький фильтр,
+        остальные проверяются по вхождению.
+        """
+        filters = [
+            [index[key] for key in dict.fromkeys(keys) if key in index]
+            for index, keys in (
+                (self._by_status, statuses),
+                (self._by_device, device_ids),
+                (self._by_area, area_ids),
+                (self._by_label, labels),
+            )
+            if keys is not None
+        ]
+        if any(not buckets for buckets in filters):
+            return []
+
+        # Диапазон дней - это диапазон дат в отсортированном списке
+        low = 0
+        high = len(self._by_next)
+        if days_min is not None:
+            low = bisect_left(self._by_next, (today.toordinal() + days_min,))
+        if days_max is not None:
+            high = bisect_left(self._by_next, (today.toordinal() + days_max + 1,))
+
+        if not filters:
+            if sort == SORT_DAYS:
+                # Список уже упорядочен по дате: берём только нужный срез
+                if limit is not None:
+                    if reverse:
+                        low = max(low, high - limit)
+                    else:
+                        high = min(high, low + limit)
+                ordered = self._by_next[low:high]
+                if reverse:
+                    ordered.reverse()
+                return [self._components[entry_id].as_dict(today) for _, entry_id in ordered]
+            matches = [self._components[entry_id] for _, entry_id in self._by_next[low:high]]
+        else:
+            filters.sort(key=lambda buckets: sum(map(len, buckets)))
+            smallest = sum(map(len, filters[0]))
+            if (
+                sort == SORT_DAYS
+                and limit is not None
+                and limit * (high - low) < smallest * smallest
+            ):
+                # Совпадения плотные: идём по датам и останавливаемся на limit
+                positions = range(high - 1, low - 1, -1) if reverse else range(low, high)
+                result: list[dict[str, Any]] = []
+                for position in positions:
+                    if len(result) >= limit:
+                        break
+                    entry_id = self._by_next[position][1]
+                    if all(_contains(buckets, entry_id) for buckets in filters):
+                        result.append(self._components[entry_id].as_dict(today))
+                return result
+
+            first, rest = filters[0], filters[1:]
+            candidates = first[0] if len(first) == 1 else set().union(*first)
+            check_range = days_min is not None or days_max is not None
+            matches = [
+                self._components[entry_id]
+                for entry_id in candidates
+                if all(_contains(buckets, entry_id) for buckets in rest)
+                and (
+                    not check_range
+                    or _in_range(self._components[entry_id], today, days_min, days_max)
+                )
+            ]
+
+        if sort == SORT_NAME:
+            key = lambda component: (component.name.casefold(), component.entry_id)  # noqa: E731
+        else:
+            key = lambda component: (component.next_maintenance, component.entry_id)  # noqa: E731
+
+        if limit is not None and limit < len(matches):
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            matches = select(limit, matches, key=key)
+        else:
+            matches.sort(key=key, reverse=reverse)
+        return [component.as_dict(today) for component in matches]
+
+    def device_entry_ids(self, device_id: str) -> frozenset[str]:
+        """Компоненты, привязанные к устройству."""
+        return frozenset(self._by_device.get(device_id, ()))
+
+
+def _add(index: dict[str, set[str]], key: str | None, entry_id: str) -> None:
+    if key is not None:
+        index.setdefault(key, set()).add(entry_id)
+
+
+def _discard(index: dict[str, set[str]], key: str | None, entry_id: str) -> None:
+    if key is None or (entries := index.get(key)) is None:
+        return
+    entries.discard(entry_id)
+    if not entries:
+        del index[key]
+
+
+def _in_range(
+    component: IndexedComponent, today: date, days_min: int | None, days_max: int | None
+) -> bool:
+    days = (component.next_maintenance - today).days
+    return (days_min is None or days >= days_min) and (days_max is None or days <= days_max)
+
+
+def _contains(buckets: list[set[str]], entry_id: str) -> bool:
+    return any(entry_id in bucket for bucket in buckets)
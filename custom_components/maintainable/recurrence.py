@@ -0,0 +1,257 @@
+"""Календарные правила повторения обслуживания (подмножество RRULE).
+
+Поддерживаемые части правила (через ``;``):
+
+* ``FREQ`` - ``DAILY``, ``WEEKLY``, ``MONTHLY`` или ``YEARLY`` (обязательно);
+* ``INTERVAL`` - шаг периода, по умолчанию 1;
+* ``BYDAY`` - дни недели (``MO,FR``), для месяцев и лет - с номером (``1MO``, ``-1FR``);
+* ``BYMONTHDAY`` - числа месяца (``1``, ``15``, ``-1`` - последний день);
+  месяцы без указанного числа пропускаются, вместе с ``BYDAY`` условия
+  пересекаются (``BYDAY=FR;BYMONTHDAY=13`` - пятница, 13-е);
+* ``BYMONTH`` - месяцы для ``YEARLY``;
+* ``DTSTART`` - опорная дата, задающая фазу периодов (по умолчанию периоды
+  выровнены по календарю: кварталы с января, недели с понедельника);
+* ``EXDATE`` - исключаемые даты (праздники), ``YYYYMMDD`` или ``YYYY-MM-DD``.
+
+Пример: ``FREQ=MONTHLY;INTERVAL=3;BYDAY=1MO`` - первый понедельник квартала.
+
+Модуль не зависит от Home Assistant: следующая дата вычисляется арифметически,
+без перебора дней.
+"""
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+FREQ_DAILY = "DAILY"
+FREQ_WEEKLY = "WEEKLY"
+FREQ_MONTHLY = "MONTHLY"
+FREQ_YEARLY = "YEARLY"
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+# Опорная дата по умолчанию: 1 января 1 года - понедельник
+_EPOCH = date(1, 1, 1)
+
+# Предел пропусков подряд (исключённые даты, несуществующие дни вроде 5-го понедельника)
+_MAX_SKIPS = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class RecurrenceRule:
+    """Разобранное правило повторения."""
+
+    freq: str
+    interval: int
+    weekdays: tuple[int, ...]
+    nth_weekdays: tuple[tuple[int, int], ...]
+    monthdays: tuple[int, ...]
+    months: tuple[int, ...]
+    dtstart: date
+    exdates: frozenset[date]
+
+    def next_after(self, after: date) -> date:
+        """Ближайшая дата повторения строго после указанной."""
+        current = after
+        for _ in range(_MAX_SKIPS):
+            candidate = self._next_candidate(current)
+            if candidate not in self.exdates:
+                return candidate
+            current = candidate
+        raise ValueError("Не удалось найти следующую дату повторения")
+
+    def _next_candidate(self, after: date) -> date:
+        """Следующая дата без учёта исключений."""
+        if self.freq == FREQ_DAILY:
+            return self._next_daily(after)
+        if self.freq == FREQ_WEEKLY:
+            return self._next_weekly(after)
+        if self.freq == FREQ_MONTHLY:
+            return self._next_monthly(after)
+        return self._next_yearly(after)
+
+    def _next_daily(self, after: date) -> date:
+        start = self.dtstart.toordinal()
+        ordinal = after.toordinal()
+        if ordinal < start:
+            return self.dtstart
+        steps = (ordinal - start) // self.interval + 1
+        return date.fromordinal(start + steps * self.interval)
+
+    def _next_weekly(self, after: date) -> date:
+        # Понедельник недели, с которой отсчитываются периоды
+        base = self.dtstart.toordinal() - self.dtstart.weekday()
+        ordinal = after.toordinal()
+        week = (ordinal - base) // 7
+        if week >= 0 and week % self.interval == 0:
+            weekday = ordinal - base - week * 7
+            for day in self.weekdays:
+                if day > weekday and base + week * 7 + day >= self.dtstart.toordinal():
+                    return date.fromordinal(base + week * 7 + day)
+        if week < 0:
+            next_week = 0
+        else:
+            next_week = (week // self.interval + 1) * self.interval
+        for day in self.weekdays:
+            ordinal = base + next_week * 7 + day
+            if ordinal >= self.dtstart.toordinal():
+                return date.fromordinal(ordinal)
+        return date.fromordinal(base + (next_week + self.interval) * 7 + self.weekdays[0])
+
+    def _next_monthly(self, after: date) -> date:
+        start = self.dtstart.year * 12 + self.dtstart.month - 1
+        month = max(after.year * 12 + after.month - 1, start)
+        offset = (month - start) % self.interval
+        if offset:
+            month += self.interval - offset
+        for _ in range(_MAX_SKIPS):
+            year, month0 = divmod(month, 12)
+            for day in self._days_in_month(year, month0 + 1):
+                candidate = date(year, month0 + 1, day)
+                if candidate > after and candidate >= self.dtstart:
+                    return candidate
+            month += self.interval
+        raise ValueError("Не удалось найти следующую дату повторения")
+
+    def _next_yearly(self, after: date) -> date:
+        year = max(after.year, self.dtstart.year)
+        offset = (year - self.dtstart.year) % self.interval
+        if offset:
+            year += self.interval - offset
+        for _ in range(_MAX_SKIPS):
+            for month in self.months:
+                for day in self._days_in_month(year, month):
+                    candidate = date(year, month, day)
+                    if candidate > after and candidate >= self.dtstart:
+                        return candidate
+            year += self.interval
+        raise ValueError("Не удалось найти следующую дату повторения")
+
+    def _days_in_month(self, year: int, month: int) -> list[int]:
+        """Дни месяца, попадающие под правило, по возрастанию."""
+        first_weekday, length = calendar.monthrange(year, month)
+        monthdays: set[int] = set()
+        for monthday in self.monthdays:
+            # Как в RRULE: несуществующие в этом месяце числа пропускаются
+            day = monthday if monthday > 0 else length + monthday + 1
+            if 1 <= day <= length:
+                monthdays.add(day)
+        weekdays: set[int] = set()
+        for nth, weekday in self.nth_weekdays:
+            first = (weekday - first_weekday) % 7 + 1
+            if nth > 0:
+                day = first + (nth - 1) * 7
+            else:
+                last = first + (length - first) // 7 * 7
+                day = last + (nth + 1) * 7
+            if 1 <= day <= length:
+                weekdays.add(day)
+        if self.monthdays and self.nth_weekdays:
+            # BYDAY и BYMONTHDAY ограничивают друг друга (RFC 5545)
+            days = monthdays & weekdays
+        else:
+            days = monthdays | weekdays
+        return sorted(days)
+
+
+def _parse_date(value: str) -> date:
+    value = value.strip().replace("-", "")
+    if len(value) != 8 or not value.isdigit():
+        raise ValueError(f"Некорректная дата: {value}")
+    return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+
+
+@lru_cache(maxsize=1024)
+def _parse_normalized(text: str) -> RecurrenceRule:
+    parts: dict[str, str] = {}
+    for part in text.split(";"):
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Некорректная часть правила: {part}")
+        parts[key] = value
+
+    freq = parts.pop("FREQ", None)
+    if freq not in (FREQ_DAILY, FREQ_WEEKLY, FREQ_MONTHLY, FREQ_YEARLY):
+        raise ValueError(f"Неподдерживаемая частота: {freq}")
+
+    interval = int(parts.pop("INTERVAL", "1"))
+    if interval < 1:
+        raise ValueError("INTERVAL должен быть больше 0")
+
+    dtstart = _parse_date(parts.pop("DTSTART")) if "DTSTART" in parts else _EPOCH
+    exdates = frozenset(
+        _parse_date(value) for value in parts.pop("EXDATE", "").split(",") if value
+    )
+
+    weekdays: set[int] = set()
+    nth_weekdays: set[tuple[int, int]] = set()
+    for value in filter(None, parts.pop("BYDAY", "").split(",")):
+        code, prefix = value[-2:], value[:-2]
+        if code not in _WEEKDAYS:
+            raise ValueError(f"Некорректный день недели: {value}")
+        if prefix:
+            nth = int(prefix)
+            if nth == 0 or abs(nth) > 5 or freq not in (FREQ_MONTHLY, FREQ_YEARLY):
+                raise ValueError(f"Некорректный номер дня недели: {value}")
+            nth_weekdays.add((nth, _WEEKDAYS[code]))
+        elif freq == FREQ_WEEKLY:
+            weekdays.add(_WEEKDAYS[code])
+        elif freq in (FREQ_MONTHLY, FREQ_YEARLY):
+            # Без номера - каждый такой день недели в месяце
+            nth_weekdays.update((nth, _WEEKDAYS[code]) for nth in range(1, 6))
+        else:
+            raise ValueError("BYDAY не поддерживается для FREQ=DAILY")
+
+    monthdays = {int(value) for value in filter(None, parts.pop("BYMONTHDAY", "").split(","))}
+    if any(day == 0 or abs(day) > 31 for day in monthdays):
+        raise ValueError("BYMONTHDAY должен быть в диапазоне 1..31 или -31..-1")
+
+    months = {int(value) for value in filter(None, parts.pop("BYMONTH", "").split(","))}
+    if any(not 1 <= month <= 12 for month in months):
+        raise ValueError("BYMONTH должен быть в диапазоне 1..12")
+    if months and freq != FREQ_YEARLY:
+        raise ValueError("BYMONTH поддерживается только для FREQ=YEARLY")
+
+    if parts:
+        raise ValueError(f"Неподдерживаемые части правила: {', '.join(sorted(parts))}")
+
+    # Значения по умолчанию берутся из опорной даты, как в RRULE
+    if freq == FREQ_WEEKLY and not weekdays:
+        weekdays.add(dtstart.weekday())
+    if freq in (FREQ_MONTHLY, FREQ_YEARLY) and not monthdays and not nth_weekdays:
+        monthdays.add(dtstart.day)
+    if freq == FREQ_YEARLY and not months:
+        months.add(dtstart.month)
+
+    rule = RecurrenceRule(
+        freq=freq,
+        interval=interval,
+        weekdays=tuple(sorted(weekdays)),
+        nth_weekdays=tuple(sorted(nth_weekdays)),
+        monthdays=tuple(sorted(monthdays)),
+        months=tuple(sorted(months)),
+        dtstart=dtstart,
+        exdates=exdates,
+    )
+    # Правило без единой даты (например, 30 февраля) отклоняется сразу
+    rule.next_after(dtstart)
+    return rule
+
+
+def parse_rule(text: str) -> RecurrenceRule:
+    """Разобрать правило повторения.
+
+    Разобранные правила кэшируются, поэтому компоненты с одинаковым правилом
+    используют один и тот же объект. Некорректное правило вызывает ``ValueError``.
+    """
+    normalized = ";".join(
+        part.strip() for part in text.upper().replace("RRULE:", "").split(";") if part.strip()
+    )
+    try:
+        return _parse_normalized(normalized)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Некорректное правило повторения '{text}': {err}") from err
@@ -7,7 +7,7 @@ from typing import Any
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -46,6 +46,8 @@ async def async_setup_entry(
 class MaintenanceBaseSensor(CoordinatorEntity):
     """Базовый класс для сенсоров обслуживания."""
 
+    _name_suffix = ""
+
     def __init__(
         self,
         coordinator: MaintenanceCoordinator,
@@ -89,10 +91,21 @@ class MaintenanceBaseSensor(CoordinatorEntity):
         """Доступность сенсора."""
         return self.coordinator.last_update_success
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Обработка обновления данных, включая переименование компонента."""
+        name = self.coordinator.data.get("name") if self.coordinator.data else None
+        if name and name != self._component_name:
+            self._component_name = name
+            self._attr_name = f"{name}{self._name_suffix}"
+        super()._handle_coordinator_update()
+
 
 class MaintenanceStatusSensor(MaintenanceBaseSensor, SensorEntity):
     """Сенсор статуса обслуживания."""
 
+    _name_suffix = " - Статус обслуживания"
+
     def __init__(
         self,
         coordinator: MaintenanceCoordinator,
@@ -102,7 +115,7 @@ class MaintenanceStatusSensor(MaintenanceBaseSensor, SensorEntity):
         super().__init__(coordinator, config_entry)
         component_name_safe = self._component_name.lower().replace(" ", "_")
         self._attr_unique_id = f"{config_entry.entry_id}{STATUS_SUFFIX}"
-        self._attr_name = f"{self._component_name} - Статус обслуживания"
+        self._attr_name = f"{self._component_name}{self._name_suffix}"
         # Устанавливаем правильный entity_id
         self.entity_id = f"sensor.{component_name_safe}{STATUS_SUFFIX}"
 
@@ -135,10 +148,15 @@ class MaintenanceStatusSensor(MaintenanceBaseSensor, SensorEntity):
             return {}
         
         return {
+            "stage": self.coordinator.data.get("stage"),
+            "next_stage_change": self.coordinator.data.get("next_stage_change"),
             "days_until_maintenance": self.coordinator.data.get("days_until_maintenance"),
             "last_maintenance_date": self.coordinator.data.get("last_maintenance_date"),
             "next_maintenance_date": self.coordinator.data.get("next_maintenance_date"),
             "maintenance_interval": self.coordinator.data.get("maintenance_interval"),
+            "recurrence": self.coordinator.data.get("recurrence"),
+            "condition_triggered": self.coordinator.data.get("condition_triggered", False),
+            "condition_entities": self.coordinator.data.get("condition_entities", []),
             "component_name": self._component_name,
         }
 
@@ -146,6 +164,8 @@ class MaintenanceStatusSensor(MaintenanceBaseSensor, SensorEntity):
 class MaintenanceDaysSensor(MaintenanceBaseSensor, SensorEntity):
     """Сенсор дней до обслуживания."""
 
+    _name_suffix = " - Дни до обслуживания"
+
     def __init__(
         self,
         coordinator: MaintenanceCoordinator,
@@ -155,7 +175,7 @@ class MaintenanceDaysSensor(MaintenanceBaseSensor, SensorEntity):
         super().__init__(coordinator, config_entry)
         component_name_safe = self._component_name.lower().replace(" ", "_")
         self._attr_unique_id = f"{config_entry.entry_id}{DAYS_SUFFIX}"
-        self._attr_name = f"{self._component_name} - Дни до обслуживания"
+        self._attr_name = f"{self._component_name}{self._name_suffix}"
         self._attr_device_class = SensorDeviceClass.DURATION
         self._attr_native_unit_of_measurement = UnitOfTime.DAYS
         # Устанавливаем правильный entity_id
@@ -174,10 +194,11 @@ class MaintenanceDaysSensor(MaintenanceBaseSensor, SensorEntity):
         if not self.coordinator.data:
             return "mdi:calendar-clock"
         
-        days = self.coordinator.data.get("days_until_maintenance", 0)
-        if days < 0:
+        # Порог "скоро" задаётся стадиями компонента, поэтому иконка следует статусу
+        status = self.coordinator.data.get("status")
+        if status == MAINTENANCE_STATUS_OVERDUE:
             return "mdi:calendar-alert"
-        elif days <= 7:
+        elif status == MAINTENANCE_STATUS_DUE:
             return "mdi:calendar-warning"
         else:
             return "mdi:calendar-check"
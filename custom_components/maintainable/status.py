@@ -0,0 +1,126 @@
+"""Правила вычисления статуса обслуживания.
+
+Модуль не зависит от Home Assistant и используется как координатором,
+так и автономным отчётом по файлам ``.storage``.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from .const import (
+    CONF_STAGES,
+    DUE_THRESHOLD,
+    MAINTENANCE_STATUS_DUE,
+    MAINTENANCE_STATUS_OK,
+    MAINTENANCE_STATUS_OVERDUE,
+    STAGE_CONDITION,
+)
+from .recurrence import parse_rule
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """Стадия предупреждения: активна, когда до срока осталось не больше ``days`` дней."""
+
+    name: str
+    days: int
+
+
+def next_maintenance_date(
+    last_maintenance: datetime, interval: float, recurrence: str | None = None
+) -> datetime:
+    """Дата следующего обслуживания по интервалу или календарному правилу."""
+    if recurrence:
+        # Правило разбирается один раз и кэшируется для всех компонентов
+        next_date = parse_rule(recurrence).next_after(last_maintenance.date())
+        return datetime.combine(next_date, last_maintenance.time())
+    return last_maintenance + timedelta(days=interval)
+
+
+def days_until(next_maintenance: datetime, today: date) -> int:
+    """Количество дней до обслуживания (отрицательное - просрочено)."""
+    return (next_maintenance.date() - today).days
+
+
+@dataclass(frozen=True, slots=True)
+class StageTable:
+    """Таблица будущих смен стадии и статуса компонента.
+
+    ``changes[i]`` - ординал даты, с которой действуют ``stages[i + 1]`` и
+    ``statuses[i + 1]``; до первой смены действуют ``stages[0]`` и ``statuses[0]``.
+    """
+
+    changes: tuple[int, ...]
+    stages: tuple[str, ...]
+    statuses: tuple[str, ...]
+
+    def lookup(self, today: date) -> tuple[str, str]:
+        """Стадия и статус на указанную дату."""
+        position = bisect_right(self.changes, today.toordinal())
+        return self.stages[position], self.statuses[position]
+
+    def next_change(self, today: date) -> date | None:
+        """Дата ближайшей смены стадии после указанной."""
+        position = bisect_right(self.changes, today.toordinal())
+        if position < len(self.changes):
+            return date.fromordinal(self.changes[position])
+        return None
+
+
+@lru_cache(maxsize=256)
+def parse_stages(text: str) -> tuple[Stage, ...]:
+    """Разобрать стадии вида ``upcoming:30,due:14,urgent:3,overdue:-1``.
+
+    Пустая строка означает отсутствие предупреждений. Некорректная запись
+    вызывает ``ValueError``.
+    """
+    stages: dict[str, Stage] = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, sep, days = part.partition(":")
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"Некорректная стадия: {part}")
+        if name in (MAINTENANCE_STATUS_OK, STAGE_CONDITION) or name in stages:
+            raise ValueError(f"Недопустимое или повторное имя стадии: {name}")
+        stages[name] = Stage(name, int(days))
+    if len({stage.days for stage in stages.values()}) != len(stages):
+        raise ValueError("У стадий должны быть разные пороги")
+    return tuple(sorted(stages.values(), key=lambda stage: -stage.days))
+
+
+def format_stages(stages: tuple[Stage, ...]) -> str:
+    """Представить стадии строкой для формы настройки."""
+    return ",".join(f"{stage.name}:{stage.days}" for stage in stages)
+
+
+def stages_from_options(options: Mapping[str, Any]) -> tuple[Stage, ...]:
+    """Стадии компонента из опций записи (по умолчанию - единый порог ``due``)."""
+    if CONF_STAGES in options:
+        return parse_stages(options[CONF_STAGES] or "")
+    return (Stage(MAINTENANCE_STATUS_DUE, DUE_THRESHOLD),)
+
+
+def build_stage_table(next_maintenance: date, stages: tuple[Stage, ...]) -> StageTable:
+    """Вычислить все будущие смены стадии для даты обслуживания.
+
+    Стадия с порогом ``days`` начинается в день ``next_maintenance - days``.
+    Просрочка (``days = -1``) всегда является сменой статуса; если
+    пользовательской стадии с таким порогом нет, она называется ``overdue``.
+    """
+    thresholds = {stage.days: stage.name for stage in stages}
+    thresholds.setdefault(-1, MAINTENANCE_STATUS_OVERDUE)
+    base = next_maintenance.toordinal()
+
+    changes: list[int] = []
+    names = [MAINTENANCE_STATUS_OK]
+    statuses = [MAINTENANCE_STATUS_OK]
+    for days in sorted(thresholds, reverse=True):
+        changes.append(base - days)
+        names.append(thresholds[days])
+        statuses.append(MAINTENANCE_STATUS_OVERDUE if days < 0 else MAINTENANCE_STATUS_DUE)
+    return StageTable(tuple(changes), tuple(names), tuple(statuses))
@@ -0,0 +1,223 @@
+"""Автономный отчёт о состоянии компонентов Maintainable по файлам ``.storage``.
+
+Home Assistant не нужен ни запущенным, ни установленным: отчёт читает
+``core.config_entries`` и файлы ``maintainable_data_*`` напрямую и применяет
+те же правила статуса, что и координатор интеграции.
+
+Примеры::
+
+    python scripts/maintainable_report.py --config /config
+    python scripts/maintainable_report.py --config /config --as-of 2026-12-31 --format json -o report.json
+
+Условия по сенсорам не учитываются: их состояние известно только работающему
+Home Assistant.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+import types
+from collections import Counter
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "maintainable"
+PACKAGE = "maintainable_offline"
+CHUNK_SIZE = 64 * 1024  # Размер блока чтения core.config_entries
+
+FIELDS = [
+    "overdue_rank",
+    "entry_id",
+    "name",
+    "status",
+    "stage",
+    "days_until_maintenance",
+    "next_maintenance_date",
+    "last_maintenance_date",
+    "maintenance_interval",
+    "recurrence",
+    "device_id",
+]
+
+
+def _load_component_modules() -> tuple[types.ModuleType, types.ModuleType]:
+    """Загрузить константы и правила статуса без ``__init__`` интеграции."""
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[PACKAGE] = package
+    return (
+        importlib.import_module(f"{PACKAGE}.const"),
+        importlib.import_module(f"{PACKAGE}.status"),
+    )
+
+
+const, status_rules = _load_component_modules()
+
+
+def iter_config_entries(path: Path) -> Iterator[dict[str, Any]]:
+    """Перебрать записи интеграции из ``core.config_entries``.
+
+    Файл читается блоками, записи декодируются по одной: в памяти одновременно
+    находятся только текущий блок и декодируемая запись.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as file:
+        # Ищем начало массива записей, не держа в памяти прочитанное до него
+        buffer = ""
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            buffer += chunk
+            key = buffer.find('"entries"')
+            start = buffer.find("[", key) if key >= 0 else -1
+            if start >= 0:
+                break
+            if not chunk:
+                return
+            buffer = buffer[key:] if key >= 0 else buffer[-len('"entries"'):]
+
+        position = start + 1
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if buffer[position] == "]":
+                    return
+                try:
+                    entry, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # Запись обрезана границей блока - дочитываем
+                    if eof:
+                        raise
+                else:
+                    if entry.get("domain") == const.DOMAIN:
+                        yield entry
+                    continue
+            elif eof:
+                return
+            chunk = file.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def iter_components(storage_dir: Path, as_of: date) -> Iterator[dict[str, Any]]:
+    """Перебрать компоненты со статусом на указанную дату."""
+    entries = {
+        entry["entry_id"]: entry
+        for entry in iter_config_entries(storage_dir / "core.config_entries")
+    }
+    prefix = f"{const.DOMAIN}_data_"
+
+    with os.scandir(storage_dir) as files:
+        for file in files:
+            if not file.name.startswith(prefix):
+                continue
+            entry = entries.pop(file.name[len(prefix):], None)
+            if entry is None:
+                # Файл удалённого компонента
+                continue
+            with open(file.path, encoding="utf-8") as handle:
+                stored_data = json.load(handle).get("data") or {}
+            yield _component(entry, stored_data, as_of)
+
+    # Компоненты, ещё не сохранявшие данные, - как при первом запуске координатора
+    for entry in entries.values():
+        yield _component(entry, {}, as_of)
+
+
+def _component(entry: dict[str, Any], stored_data: dict[str, Any], as_of: date) -> dict[str, Any]:
+    """Строка отчёта по записи конфигурации и сохранённым данным."""
+    data = entry.get("data") or {}
+    options = entry.get("options") or {}
+    last_maintenance_date = (
+        stored_data.get("last_maintenance_date")
+        or data.get("last_maintenance_date")
+        or datetime.combine(as_of, datetime.min.time()).isoformat()
+    )
+    interval = stored_data.get("maintenance_interval", data.get("maintenance_interval", 30))
+    recurrence = stored_data.get(const.CONF_RECURRENCE) or data.get(const.CONF_RECURRENCE)
+
+    next_maintenance = status_rules.next_maintenance_date(
+        datetime.fromisoformat(last_maintenance_date), interval, recurrence
+    )
+    days_until_maintenance = status_rules.days_until(next_maintenance, as_of)
+    stage, status = status_rules.build_stage_table(
+        next_maintenance.date(), status_rules.stages_from_options(options)
+    ).lookup(as_of)
+    return {
+        "overdue_rank": None,
+        "entry_id": entry["entry_id"],
+        "name": stored_data.get("name") or data.get("name") or entry.get("title"),
+        "status": status,
+        "stage": stage,
+        "days_until_maintenance": days_until_maintenance,
+        "next_maintenance_date": next_maintenance.isoformat(),
+        "last_maintenance_date": last_maintenance_date,
+        "maintenance_interval": interval,
+        "recurrence": recurrence,
+        "device_id": data.get("device_id"),
+    }
+
+
+def build_report(storage_dir: Path, as_of: date) -> list[dict[str, Any]]:
+    """Компоненты, отсортированные по сроку, с рангом просрочки."""
+    components = sorted(
+        iter_components(storage_dir, as_of),
+        key=lambda component: (component["days_until_maintenance"], component["entry_id"]),
+    )
+    for rank, component in enumerate(components, start=1):
+        if component["status"] != const.MAINTENANCE_STATUS_OVERDUE:
+            break
+        component["overdue_rank"] = rank
+    return components
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description="Отчёт о состоянии компонентов Maintainable")
+    parser.add_argument("--config", default=".", help="каталог конфигурации Home Assistant")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="дата отчёта (YYYY-MM-DD), по умолчанию сегодня")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("-o", "--output", help="файл отчёта, по умолчанию stdout")
+    args = parser.parse_args(argv)
+
+    storage_dir = Path(args.config) / ".storage"
+    if not (storage_dir / "core.config_entries").is_file():
+        parser.error(f"не найден {storage_dir / 'core.config_entries'}")
+
+    components = build_report(storage_dir, args.as_of)
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(output, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(components)
+        else:
+            json.dump(
+                {
+                    "as_of": args.as_of.isoformat(),
+                    "summary": {"total": len(components), **Counter(c["status"] for c in components)},
+                    "components": components,
+                },
+                output,
+                ensure_ascii=False,
+                indent=2,
+            )
+            output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())